@@ -1,4 +1,7 @@
 #!/usr/bin/env python3
+import hashlib
+import http.client
+import io
 import json
 import os
 import re
@@ -6,24 +9,101 @@ import socket
 import subprocess
 import sys
 import threading
+import time
 import asyncio
 import websockets
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import urlparse
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlparse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 PROXIES = {}
 LOCK = threading.Lock()
 WEBSOCKET_SERVER = None
+# Bumped (under LOCK) whenever PROXIES changes, so the /api/containers body is only rebuilt then
+PROXIES_VERSION = 0
+
+# Opt-in SO_REUSEPORT on the listening sockets so several server processes can share
+# them; off by default so an accidental second instance fails with EADDRINUSE
+API_REUSE_PORT = os.environ.get("API_REUSE_PORT", "0") == "1"
+
+# Read size for the VNC -> WebSocket direction; framebuffer updates are bulky
+VNC_PROXY_BUFSIZE = int(os.environ.get("VNC_PROXY_BUFSIZE", "131072"))
+# Kernel socket buffer size for both legs of the proxy
+PROXY_SOCKET_BUFSIZE = 1 << 20
+
+# Encoded /api/containers response for PROXIES_VERSION "version"
+_CONTAINERS_CACHE = {"version": -1, "body": b"{}", "etag": '""'}
+
+# Short-lived cache of discover_existing_containers() so polling clients don't hammer dockerd
+_DISCOVER_CACHE = {"ts": 0.0, "data": {}}
+_DISCOVER_TTL = 1.0
+# When a proxy request for an unknown container last forced a discovery
+_LAST_FORCED_DISCOVERY = 0.0
+# VNC ports read from the logs of containers without a published port, keyed by container ID
+_LOG_VNC_PORTS: dict[str, int] = {}
+# When reading a container's logs last timed out; the logs are not re-read before
+# _LOG_MISS_RETRY seconds have passed (unless forced), so one wedged container can't
+# stall every poll. Logs that simply don't show the port yet are retried on each poll
+_LOG_VNC_MISSES: dict[str, float] = {}
+_LOG_MISS_RETRY = 30.0
+# Maximum number of docker subprocesses a single discovery runs in parallel
+_DISCOVER_CONCURRENCY = 8
+
+# Line x11vnc prints once at startup, e.g. "Listening for VNC connections on TCP port 5900"
+_VNC_LOG_RE = re.compile(r"Listening for VNC connections on TCP port (\d+)")
+# Published VNC port in `docker ps` output, e.g. "0.0.0.0:5901->5900/tcp"
+_PUBLISHED_VNC_PORT_RE = re.compile(r"(?:0\.0\.0\.0|127\.0\.0\.1|\[::\]):(\d+)->59\d\d/tcp")
+
+# Socket states as they appear in /proc/net/tcp
+TCP_ESTABLISHED = b"01"
+TCP_LISTEN = b"0A"
+
+# Directory holding the web client, next to this script
+_WEB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web")
+_WEB_DIR_REAL = os.path.realpath(_WEB_DIR)
+
+# Content types of static files served from web/, by extension
+_CT = {
+    ".html": "text/html",
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".ico": "image/x-icon",
+}
+
+
+def json_bytes(obj) -> bytes:
+    """Serialize `obj` to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
 
 
 def find_free_tcp_port(preferred_start: int | None = None, preferred_end: int | None = None) -> int:
     if preferred_start is not None:
         # Try a range starting at preferred_start
         end_port = preferred_end if preferred_end is not None else preferred_start + 200
+        # Skip ports the kernel already reports as listening or connected; the bind
+        # below only confirms the pick. No SO_REUSEADDR, so a port that is merely
+        # reusable is not mistaken for a free one
+        in_use = local_tcp_ports(states=(TCP_LISTEN, TCP_ESTABLISHED))
         for port in range(preferred_start, end_port):
+            if port in in_use:
+                continue
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 try:
                     s.bind(("127.0.0.1", port))
                     return port
@@ -35,12 +115,45 @@ def find_free_tcp_port(preferred_start: int | None = None, preferred_end: int |
         return s.getsockname()[1]
 
 
+def local_tcp_ports(states: tuple[bytes, ...] = (TCP_LISTEN,)) -> set[int]:
+    """Return local TCP ports with a socket in one of `states`, read from /proc/net/tcp{,6}"""
+    ports = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, "rb") as f:
+                lines = f.read().splitlines()[1:]  # Skip header
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            # fields[1] is "ADDR:PORT" in hex, fields[3] is the state
+            if len(fields) > 3 and fields[3] in states:
+                ports.add(int(fields[1].rsplit(b":", 1)[1], 16))
+    return ports
+
+
+def tune_proxy_socket(sock: socket.socket) -> None:
+    """Disable Nagle and enlarge kernel buffers for bursty VNC traffic"""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, PROXY_SOCKET_BUFSIZE)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, PROXY_SOCKET_BUFSIZE)
+
+
 def choose_display(start: int = 99, limit: int = 199) -> str:
+    # Scan /proc/*/cmdline directly instead of forking `ps -ef`
+    used = set()
     try:
-        ps_out = subprocess.run(["ps", "-ef"], capture_output=True, text=True, check=True).stdout
-    except Exception:
-        ps_out = ""
-    used = set(int(m.group(1)) for m in re.finditer(r"Xvfb\s+:(\d+)", ps_out))
+        pids = [pid for pid in os.listdir("/proc") if pid.isdigit()]
+    except OSError:
+        pids = []
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue  # Process exited or is not readable
+        if len(args) > 1 and os.path.basename(args[0]) == b"Xvfb" and args[1][:1] == b":" and args[1][1:].isdigit():
+            used.add(int(args[1][1:]))
     for n in range(start, limit + 1):
         if n not in used:
             return f":{n}"
@@ -48,6 +161,22 @@ def choose_display(start: int = 99, limit: int = 199) -> str:
     return f":{start}"
 
 
+async def open_vnc_socket(port: int) -> socket.socket:
+    """Connect a non-blocking TCP socket to a VNC server on localhost"""
+    loop = asyncio.get_running_loop()
+    error = None
+    for family, type_, proto, _, addr in await loop.getaddrinfo("localhost", port, type=socket.SOCK_STREAM):
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, addr)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"Could not resolve localhost:{port}")
+
+
 async def websocket_proxy_handler(websocket):
     """Handle WebSocket connections and proxy to VNC servers"""
     try:
@@ -63,42 +192,69 @@ async def websocket_proxy_handler(websocket):
         container_id = path_parts[2]
         
         with LOCK:
-            if container_id not in PROXIES:
-                await websocket.close(1008, f"Container {container_id} not found")
-                return
-            
-            vnc_port = PROXIES[container_id]["vncPort"]
+            meta = find_container(PROXIES, container_id)
+        # Never await while holding LOCK: HTTP and WebSocket handlers share one event loop
+        if meta is None:
+            # The container may have been started through another worker process, which
+            # a cached discovery wouldn't know about yet; force a refresh, at most once per TTL
+            global _LAST_FORCED_DISCOVERY
+            force = time.monotonic() - _LAST_FORCED_DISCOVERY >= _DISCOVER_TTL
+            if force:
+                _LAST_FORCED_DISCOVERY = time.monotonic()
+            meta = find_container(await discover_existing_containers(force=force), container_id)
+        if meta is None:
+            await websocket.close(1008, f"Container {container_id} not found")
+            return
+        
+        vnc_port = meta["vncPort"]
         
         print(f"DEBUG: WebSocket proxy connecting to VNC port {vnc_port}", file=sys.stderr)
         
-        # Connect to the VNC server
-        reader, writer = await asyncio.open_connection('localhost', vnc_port)
+        # Connect to the VNC server with a bare socket; StreamReader/StreamWriter
+        # would add an extra user-space copy in each direction
+        loop = asyncio.get_running_loop()
+        sock = await open_vnc_socket(vnc_port)
+        tune_proxy_socket(sock)
+        
+        # Input frames are queued and coalesced by a single writer so bursts of
+        # small messages (mouse moves) become one send on the VNC socket
+        send_q = asyncio.Queue(maxsize=128)
         
         # Create tasks for bidirectional data transfer
         async def forward_to_vnc():
             try:
                 async for message in websocket:
-                    if isinstance(message, bytes):
-                        writer.write(message)
-                    else:
-                        writer.write(message.encode('utf-8'))
-                    await writer.drain()
+                    # RFB is a binary protocol; a text frame is a client bug
+                    if not isinstance(message, bytes):
+                        await websocket.close(1003, "binary only")
+                        break
+                    await send_q.put(message)
             except Exception as e:
                 print(f"DEBUG: Error forwarding to VNC: {e}", file=sys.stderr)
-            finally:
-                try:
-                    writer.close()
-                    await writer.wait_closed()
-                except:
-                    pass
+        
+        async def write_to_vnc():
+            try:
+                while True:
+                    message = await send_q.get()
+                    buf = message
+                    if not send_q.empty():
+                        buf = bytearray(message)
+                    while not send_q.empty() and len(buf) < 65536:
+                        buf += send_q.get_nowait()
+                    await loop.sock_sendall(sock, buf)
+            except Exception as e:
+                print(f"DEBUG: Error writing to VNC: {e}", file=sys.stderr)
         
         async def forward_from_vnc():
+            buf = bytearray(VNC_PROXY_BUFSIZE)
+            view = memoryview(buf)
             try:
                 while True:
-                    data = await reader.read(4096)
-                    if not data:
+                    n = await loop.sock_recv_into(sock, buf)
+                    if not n:
                         break
-                    await websocket.send(data)
+                    # The frame is serialized before send() returns, so buf can be reused
+                    await websocket.send(view[:n])
             except Exception as e:
                 print(f"DEBUG: Error forwarding from VNC: {e}", file=sys.stderr)
             finally:
@@ -107,12 +263,20 @@ async def websocket_proxy_handler(websocket):
                 except:
                     pass
         
-        # Start both forwarding tasks
-        await asyncio.gather(
-            forward_to_vnc(),
-            forward_from_vnc(),
-            return_exceptions=True
-        )
+        # Start the forwarding tasks; as soon as either direction stops, tear the
+        # others down so the VNC socket and websocket are released promptly
+        tasks = {
+            asyncio.create_task(forward_to_vnc()),
+            asyncio.create_task(write_to_vnc()),
+            asyncio.create_task(forward_from_vnc()),
+        }
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            sock.close()
         
     except Exception as e:
         print(f"DEBUG: WebSocket proxy error: {e}", file=sys.stderr)
@@ -122,49 +286,181 @@ async def websocket_proxy_handler(websocket):
             pass
 
 
-def discover_existing_containers():
+async def run_command(*args, timeout: float | None = None, check: bool = False) -> subprocess.CompletedProcess:
+    """Run a command without blocking the event loop, mirroring subprocess.run(capture_output=True, text=True)"""
+    proc = await asyncio.create_subprocess_exec(
+        *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise subprocess.TimeoutExpired(args, timeout)
+    result = subprocess.CompletedProcess(
+        args, proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+    )
+    if check:
+        result.check_returncode()
+    return result
+
+
+async def vnc_port_from_logs(container_id: str, timeout: float = 5, follow: bool = False) -> int | None:
+    """Stream `docker logs` until the x11vnc startup line instead of reading the whole log
+
+    With follow=True the logs are tailed live, so a freshly started container is
+    answered as soon as VNC comes up rather than after a fixed delay.
+    """
+    follow_args = ["--follow"] if follow else []
+    proc = await asyncio.create_subprocess_exec(
+        "docker", "logs", *follow_args, container_id,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, limit=1 << 20
+    )
+
+    async def scan():
+        # Look for "Listening for VNC connections on TCP port XXXX"
+        async for line in proc.stdout:
+            port_match = _VNC_LOG_RE.search(line.decode(errors="replace"))
+            if port_match:
+                return int(port_match.group(1))
+        return None
+
+    try:
+        return await asyncio.wait_for(scan(), timeout)
+    finally:
+        if not follow:
+            # A plain `docker logs` exits on its own once the log is written out;
+            # killing it would reap it behind the child watcher's back
+            try:
+                await asyncio.wait_for(proc.wait(), 1)
+            except asyncio.TimeoutError:
+                pass
+        if proc.returncode is None:
+            try:
+                proc.kill()
+            except ProcessLookupError:
+                pass
+        await proc.wait()
+
+
+def mark_proxies_changed():
+    """Record a PROXIES mutation; call with LOCK held"""
+    global PROXIES_VERSION
+    PROXIES_VERSION += 1
+
+
+def containers_json() -> tuple[bytes, str]:
+    """Return the /api/containers body and its ETag, re-encoding only after PROXIES changed"""
+    with LOCK:
+        if _CONTAINERS_CACHE["version"] == PROXIES_VERSION:
+            return _CONTAINERS_CACHE["body"], _CONTAINERS_CACHE["etag"]
+        version = PROXIES_VERSION
+        snapshot = {
+            cid: {"vncPort": meta["vncPort"]}
+            for cid, meta in PROXIES.items()
+        }
+    # Encode outside LOCK
+    body = json_bytes(snapshot)
+    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+    with LOCK:
+        if version == PROXIES_VERSION:
+            _CONTAINERS_CACHE.update(version=version, body=body, etag=etag)
+    return body, etag
+
+
+def find_container(containers: dict, container_id: str):
+    """Look up a container by full ID, falling back to a unique ID prefix (e.g. a short ID)"""
+    meta = containers.get(container_id)
+    if meta is None and container_id:
+        matches = [cid for cid in containers if cid.startswith(container_id)]
+        if len(matches) == 1:
+            meta = containers[matches[0]]
+    return meta
+
+
+def invalidate_discover_cache():
+    """Force the next discover_existing_containers() call to query Docker"""
+    with LOCK:
+        _DISCOVER_CACHE["ts"] = 0.0
+
+
+async def discover_existing_containers(force: bool = False):
     """Discover all existing chrome-gui containers and their VNC ports"""
+    if not force:
+        with LOCK:
+            if time.monotonic() - _DISCOVER_CACHE["ts"] < _DISCOVER_TTL:
+                print("DEBUG: Using cached container discovery", file=sys.stderr)
+                return dict(_DISCOVER_CACHE["data"])
+    discovered = await _discover_existing_containers(force)
+    with LOCK:
+        _DISCOVER_CACHE["ts"] = time.monotonic()
+        _DISCOVER_CACHE["data"] = discovered
+    return dict(discovered)
+
+
+async def _discover_existing_containers(force: bool = False):
     try:
-        # Find all running chrome-gui containers (only running ones)
-        result = subprocess.run([
-            "docker", "ps", "--filter", "ancestor=chrome-gui", "--filter", "status=running",
-            "--format", "{{.ID}}"
-        ], capture_output=True, text=True, check=True)
+        # Find all running chrome-gui containers (only running ones) in a single call;
+        # the Ports column carries the published VNC port for bridged containers.
+        # --no-trunc keys everything by the full ID the launcher hands to the browser
+        result = await run_command(
+            "docker", "ps", "--no-trunc", "--filter", "ancestor=chrome-gui", "--filter", "status=running",
+            "--format", "{{.ID}}|{{.Ports}}|{{.State}}",
+            check=True
+        )
         
-        container_ids = result.stdout.strip().split('\n') if result.stdout.strip() else []
+        rows = result.stdout.strip().split('\n') if result.stdout.strip() else []
         discovered = {}
+        # Bound concurrent docker RPCs so a cold discovery doesn't fork dozens at once
+        sem = asyncio.Semaphore(_DISCOVER_CONCURRENCY)
         
-        for container_id in container_ids:
-            if not container_id:
-                continue
-                
+        async def discover_one(container_id, ports, state):
             try:
-                # Double-check container is actually running
-                status_result = subprocess.run([
-                    "docker", "inspect", container_id, "--format", "{{.State.Running}}"
-                ], capture_output=True, text=True, timeout=2)
-                
-                if status_result.stdout.strip() != "true":
+                if state and state != "running":
                     print(f"DEBUG: Container {container_id[:8]}... is not running, skipping", file=sys.stderr)
-                    continue
-                
-                # Get container logs to find VNC port
-                logs_result = subprocess.run([
-                    "docker", "logs", container_id
-                ], capture_output=True, text=True, timeout=5)
+                    return
                 
-                # Look for VNC port in logs
-                import re
-                port_match = re.search(r"Listening for VNC connections on TCP port (\d+)", logs_result.stdout)
+                port_match = _PUBLISHED_VNC_PORT_RE.search(ports)
                 if port_match:
                     vnc_port = int(port_match.group(1))
+                else:
+                    # No published port (e.g. host networking): get container logs to find VNC port.
+                    # The port never changes for a container, so the logs are only read once
+                    vnc_port = _LOG_VNC_PORTS.get(container_id)
+                    last_miss = _LOG_VNC_MISSES.get(container_id)
+                    backing_off = last_miss is not None and time.monotonic() - last_miss < _LOG_MISS_RETRY
+                    if vnc_port is None and (force or not backing_off):
+                        async with sem:
+                            try:
+                                vnc_port = await vnc_port_from_logs(container_id, timeout=5)
+                            except asyncio.TimeoutError:
+                                _LOG_VNC_MISSES[container_id] = time.monotonic()
+                                vnc_port = None
+                        if vnc_port is not None:
+                            _LOG_VNC_PORTS[container_id] = vnc_port
+                            _LOG_VNC_MISSES.pop(container_id, None)
+                if vnc_port is not None:
                     discovered[container_id] = {"vncPort": vnc_port}
                     print(f"DEBUG: Discovered existing container {container_id[:8]}... on VNC port {vnc_port}", file=sys.stderr)
                 else:
-                    print(f"DEBUG: Container {container_id[:8]}... has no VNC port in logs", file=sys.stderr)
+                    print(f"DEBUG: Container {container_id[:8]}... has no VNC port in ports or logs", file=sys.stderr)
                     
             except Exception as e:
                 print(f"DEBUG: Could not get info for container {container_id[:8]}...: {e}", file=sys.stderr)
+        
+        tasks = []
+        for row in rows:
+            container_id, _, rest = row.partition('|')
+            ports, _, state = rest.rpartition('|')
+            if container_id:
+                tasks.append(discover_one(container_id, ports, state))
+        await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # Forget log-derived ports of containers that are gone
+        running_ids = {row.partition('|')[0] for row in rows}
+        for cache in (_LOG_VNC_PORTS, _LOG_VNC_MISSES):
+            for container_id in [cid for cid in cache if cid not in running_ids]:
+                del cache[container_id]
                 
         return discovered
     except Exception as e:
@@ -172,10 +468,12 @@ def discover_existing_containers():
         return {}
 
 
-def start_container_and_proxy():
-    debug_port = find_free_tcp_port(9222)
-    vnc_port = find_free_tcp_port(5900)
-    display = choose_display()
+async def start_container_and_proxy():
+    # These scan /proc/net/tcp{,6} and /proc/*/cmdline, which can be large on a busy
+    # host; run them in a thread so proxied VNC sessions on the loop keep flowing
+    debug_port = await asyncio.to_thread(find_free_tcp_port, 9222)
+    vnc_port = await asyncio.to_thread(find_free_tcp_port, 5900)
+    display = await asyncio.to_thread(choose_display)
     
     # Log the port assignment for debugging
     print(f"DEBUG: Using ports - debug:{debug_port}, vnc:{vnc_port}, display:{display}", file=sys.stderr)
@@ -185,9 +483,7 @@ def start_container_and_proxy():
         raise RuntimeError(f"Launch script not found: {script_path}")
 
     # Run the container launch script; returns JSON
-    result = subprocess.run([
-        "/bin/bash", script_path, str(debug_port), str(vnc_port), display
-    ], capture_output=True, text=True, check=True)
+    result = await run_command("/bin/bash", script_path, str(debug_port), str(vnc_port), display, check=True)
 
     try:
         payload = json.loads(result.stdout.strip())
@@ -198,6 +494,12 @@ def start_container_and_proxy():
     ws_endpoint = payload.get("wsEndpoint")
     if not container_id:
         raise RuntimeError("Launcher did not return containerId")
+    if len(container_id) < 64:
+        # Discovery and the log port cache are keyed by full IDs (docker ps --no-trunc);
+        # a short ID would be pruned as "gone" and the seeded port re-read from the logs
+        inspected = await run_command("docker", "inspect", "--format", "{{.Id}}", container_id)
+        if inspected.returncode == 0 and inspected.stdout.strip():
+            container_id = inspected.stdout.strip()
 
     # Wait for the new container's VNC server to start and find its specific port
     # The container script should tell us the actual port, but let's also detect it
@@ -205,17 +507,11 @@ def start_container_and_proxy():
     
     # First, try to get the port from the container logs
     try:
-        import time
-        time.sleep(1)  # Give the container a moment to start VNC
-        logs_result = subprocess.run([
-            "docker", "logs", container_id
-        ], capture_output=True, text=True, timeout=5)
-        
-        # Look for "Listening for VNC connections on TCP port XXXX"
-        import re
-        port_match = re.search(r"Listening for VNC connections on TCP port (\d+)", logs_result.stdout)
-        if port_match:
-            actual_vnc_port = int(port_match.group(1))
+        # Follow the logs until VNC announces its port instead of sleeping a fixed second
+        actual_vnc_port = await vnc_port_from_logs(container_id, timeout=5, follow=True)
+        if actual_vnc_port:
+            _LOG_VNC_PORTS[container_id] = actual_vnc_port
+            _LOG_VNC_MISSES.pop(container_id, None)
             print(f"DEBUG: Found VNC port {actual_vnc_port} from container logs", file=sys.stderr)
     except Exception as e:
         print(f"DEBUG: Could not get port from container logs: {e}", file=sys.stderr)
@@ -223,19 +519,14 @@ def start_container_and_proxy():
     # Fallback: scan for newly opened ports
     if not actual_vnc_port:
         print("DEBUG: Scanning for new VNC port...", file=sys.stderr)
-        for port in range(5900, 5920):  # Check a reasonable range
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(0.1)
-                    if s.connect_ex(("localhost", port)) == 0:
-                        # Check if this port wasn't in our existing proxies
-                        port_in_use = any(meta.get("vncPort") == port for meta in PROXIES.values())
-                        if not port_in_use:
-                            actual_vnc_port = port
-                            print(f"DEBUG: Found new VNC port {actual_vnc_port} by scanning", file=sys.stderr)
-                            break
-            except:
-                pass
+        listening = await asyncio.to_thread(local_tcp_ports)
+        with LOCK:
+            known_ports = {meta.get("vncPort") for meta in PROXIES.values()}
+        # Check a reasonable range, skipping ports of our existing proxies
+        candidates = [p for p in range(5900, 5920) if p in listening and p not in known_ports]
+        if candidates:
+            actual_vnc_port = candidates[0]
+            print(f"DEBUG: Found new VNC port {actual_vnc_port} by scanning", file=sys.stderr)
     
     # Final fallback to requested port
     if not actual_vnc_port:
@@ -246,6 +537,8 @@ def start_container_and_proxy():
     
     with LOCK:
         PROXIES[container_id] = {"vncPort": actual_vnc_port}
+        mark_proxies_changed()
+    invalidate_discover_cache()
 
     return {
         "containerId": container_id,
@@ -256,7 +549,100 @@ def start_container_and_proxy():
     }
 
 
-class Handler(BaseHTTPRequestHandler):
+class AsyncHTTPRequestHandler:
+    """Minimal HTTP/1.0 handler on asyncio streams with a BaseHTTPRequestHandler-style API"""
+    server_version = "AsyncHTTP/0.1"
+    max_header_bytes = 65536
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.wfile = writer
+        self.client_address = writer.get_extra_info("peername") or ("-", 0)
+        self.requestline = ""
+        self._headers_buffer = []
+
+    @classmethod
+    async def handle_connection(cls, reader, writer):
+        """asyncio.start_server callback: serve one request, then close (HTTP/1.0)"""
+        handler = cls(reader, writer)
+        try:
+            await handler.handle_one_request()
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as e:
+            handler.log_message(f"Error handling request: {e}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def handle_one_request(self):
+        self.requestline = (await self.reader.readline()).decode("iso-8859-1").rstrip("\r\n")
+        words = self.requestline.split()
+        if not words:
+            # Connection closed or blank line without a request (e.g. browser preconnect)
+            return
+        if len(words) != 3:
+            self.send_response(400)
+            self.end_headers()
+            return
+        self.command, self.path, self.request_version = words
+
+        raw_headers = bytearray()
+        while True:
+            line = await self.reader.readline()
+            raw_headers += line
+            if line in (b"\r\n", b"\n", b""):
+                break
+            if len(raw_headers) > self.max_header_bytes:
+                self.send_response(431)
+                self.end_headers()
+                return
+        self.headers = http.client.parse_headers(io.BytesIO(bytes(raw_headers)))
+
+        # Request bodies are not used by any endpoint, but drain them anyway
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.send_response(400)
+            self.end_headers()
+            return
+        if length:
+            await self.reader.readexactly(length)
+
+        method = getattr(self, "do_" + self.command, None)
+        if method is None:
+            self.send_response(501)
+            self.end_headers()
+            return
+        await method()
+
+    def send_response(self, code):
+        self.log_message('"%s" %s -', self.requestline, code)
+        self._headers_buffer.append(f"HTTP/1.0 {code} {HTTPStatus(code).phrase}\r\n".encode("latin-1"))
+        self.send_header("Server", f"{self.server_version} Python/{sys.version.split()[0]}")
+        self.send_header("Date", formatdate(usegmt=True))
+
+    def send_header(self, keyword, value):
+        self._headers_buffer.append(f"{keyword}: {value}\r\n".encode("latin-1"))
+
+    def end_headers(self):
+        self._headers_buffer.append(b"\r\n")
+        self.wfile.write(b"".join(self._headers_buffer))
+        self._headers_buffer = []
+
+    def log_message(self, format, *args):
+        message = format % args if args else format
+        timestamp = time.strftime("%d/%b/%Y %H:%M:%S")
+        print(f"{self.client_address[0]} - - [{timestamp}] {message}", file=sys.stderr)
+
+
+class Handler(AsyncHTTPRequestHandler):
     server_version = "VNCClientAPI/0.1"
 
     def _set_cors(self):
@@ -264,43 +650,85 @@ class Handler(BaseHTTPRequestHandler):
         self.send_header("Access-Control-Allow-Methods", "GET, POST, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
 
-    def do_OPTIONS(self):
+    def _etag_matches(self, etag):
+        return etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(","))
+
+    async def _serve_static(self, file_path):
+        with open(file_path, "rb") as f:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            etag = f'"{size}-{st.st_mtime_ns}"'
+            if self._etag_matches(etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            # Determine content type based on file extension
+            self.send_header("Content-Type", _CT.get(os.path.splitext(file_path)[1].lower(), "text/plain"))
+            self.send_header("Content-Length", str(size))
+            self.send_header("ETag", etag)
+            self.end_headers()
+
+            # Let the kernel copy file pages straight to the socket;
+            # loop.sendfile falls back to read+write where sendfile is unavailable
+            await self.wfile.drain()
+            try:
+                await asyncio.get_running_loop().sendfile(self.wfile.transport, f, 0, size)
+            except NotImplementedError:
+                # uvloop has no loop.sendfile at all
+                self.wfile.write(f.read())
+
+    async def do_OPTIONS(self):
         self.send_response(204)
         self._set_cors()
         self.end_headers()
 
-    def do_GET(self):
-        if self.path == "/health":
+    async def do_GET(self):
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path == "/health":
             self.send_response(200)
             self._set_cors()
             self.send_header("Content-Type", "application/json")
             self.end_headers()
-            self.wfile.write(json.dumps({"ok": True}).encode())
+            self.wfile.write(json_bytes({"ok": True}))
             return
-        if self.path == "/api/containers":
+        if path == "/api/containers":
             # Refresh container list by discovering all existing containers
-            discovered = discover_existing_containers()
+            force = parse_qs(parsed.query).get("force", ["0"])[0] == "1"
+            discovered = await discover_existing_containers(force=force)
             with LOCK:
                 # Replace tracked containers with only currently running ones
-                PROXIES.clear()
-                PROXIES.update(discovered)
-                data = {
-                    cid: {"vncPort": meta["vncPort"]}
-                    for cid, meta in PROXIES.items()
-                }
+                if PROXIES != discovered:
+                    PROXIES.clear()
+                    PROXIES.update(discovered)
+                    mark_proxies_changed()
+            body, etag = containers_json()
+            if self._etag_matches(etag):
+                self.send_response(304)
+                self._set_cors()
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
             self.send_response(200)
             self._set_cors()
             self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("ETag", etag)
             self.end_headers()
-            self.wfile.write(json.dumps(data).encode())
+            self.wfile.write(body)
             return
-        if self.path == "/api/containers/cleanup":
+        if path == "/api/containers/cleanup":
             # Clean up stopped containers from our tracking
             try:
-                result = subprocess.run([
-                    "docker", "ps", "--filter", "ancestor=chrome-gui", 
-                    "--format", "{{.ID}}"
-                ], capture_output=True, text=True, check=True)
+                result = await run_command(
+                    "docker", "ps", "--no-trunc", "--filter", "ancestor=chrome-gui",
+                    "--format", "{{.ID}}",
+                    check=True
+                )
                 
                 running_ids = set(result.stdout.strip().split('\n')) if result.stdout.strip() else set()
                 running_ids.discard('')  # Remove empty strings
@@ -311,73 +739,44 @@ class Handler(BaseHTTPRequestHandler):
                     for cid in stopped_containers:
                         del PROXIES[cid]
                         print(f"DEBUG: Removed stopped container {cid[:8]}... from tracking", file=sys.stderr)
+                    if stopped_containers:
+                        mark_proxies_changed()
                 
                 self.send_response(200)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({"removed": stopped_containers}).encode())
+                self.wfile.write(json_bytes({"removed": stopped_containers}))
                 return
             except Exception as e:
                 self.send_response(500)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({"error": str(e)}).encode())
+                self.wfile.write(json_bytes({"error": str(e)}))
                 return
 
         # Serve static files from the web directory
-        if self.path == "/" or self.path.startswith("/"):
+        if path == "/" or path.startswith("/"):
             try:
-                # Get the directory where this script is located
-                script_dir = os.path.dirname(os.path.abspath(__file__))
-                
                 # Map root to index.html
-                if self.path == "/":
-                    file_path = os.path.join(script_dir, "web", "index.html")
+                if path == "/":
+                    file_path = os.path.join(_WEB_DIR, "index.html")
                 else:
-                    file_path = os.path.join(script_dir, "web" + self.path)
+                    file_path = _WEB_DIR + path
                 
                 # Security: prevent directory traversal
-                if ".." in file_path:
+                if os.path.commonpath([_WEB_DIR_REAL, os.path.realpath(file_path)]) != _WEB_DIR_REAL:
                     self.send_response(403)
                     self.end_headers()
                     return
                 
-                # Determine content type based on file extension
-                content_type = "text/plain"
-                if file_path.endswith(".html"):
-                    content_type = "text/html"
-                elif file_path.endswith(".js"):
-                    content_type = "application/javascript"
-                elif file_path.endswith(".css"):
-                    content_type = "text/css"
-                elif file_path.endswith(".png"):
-                    content_type = "image/png"
-                elif file_path.endswith(".jpg") or file_path.endswith(".jpeg"):
-                    content_type = "image/jpeg"
-                elif file_path.endswith(".ico"):
-                    content_type = "image/x-icon"
-                
-                with open(file_path, "rb") as f:
-                    content = f.read()
-                
-                self.send_response(200)
-                self.send_header("Content-Type", content_type)
-                self.end_headers()
-                self.wfile.write(content)
+                await self._serve_static(file_path)
                 return
             except FileNotFoundError:
                 # If file not found, serve index.html for SPA routing
                 try:
-                    script_dir = os.path.dirname(os.path.abspath(__file__))
-                    index_path = os.path.join(script_dir, "web", "index.html")
-                    with open(index_path, "rb") as f:
-                        content = f.read()
-                    self.send_response(200)
-                    self.send_header("Content-Type", "text/html")
-                    self.end_headers()
-                    self.wfile.write(content)
+                    await self._serve_static(os.path.join(_WEB_DIR, "index.html"))
                     return
                 except FileNotFoundError:
                     pass
@@ -388,19 +787,20 @@ class Handler(BaseHTTPRequestHandler):
         self._set_cors()
         self.end_headers()
 
-    def do_POST(self):
+    async def do_POST(self):
         if self.path.startswith("/api/containers/") and self.path.endswith("/stop"):
             # Stop a specific container
             container_id = self.path.split("/")[3]  # Extract container ID from path
             try:
                 # First check if container exists and is running
-                status_result = subprocess.run([
-                    "docker", "inspect", container_id, "--format", "{{.State.Running}}"
-                ], capture_output=True, text=True, timeout=2)
+                status_result = await run_command(
+                    "docker", "inspect", container_id, "--format", "{{.State.Running}}",
+                    timeout=2
+                )
                 
                 if status_result.returncode == 0 and status_result.stdout.strip() == "true":
                     # Container exists and is running, stop it
-                    subprocess.run(["docker", "stop", container_id], check=True, timeout=10)
+                    await run_command("docker", "stop", container_id, check=True, timeout=10)
                     print(f"DEBUG: Successfully stopped container {container_id[:8]}...", file=sys.stderr)
                 else:
                     # Container doesn't exist or is already stopped
@@ -410,55 +810,59 @@ class Handler(BaseHTTPRequestHandler):
                 with LOCK:
                     if container_id in PROXIES:
                         del PROXIES[container_id]
+                        mark_proxies_changed()
                         print(f"DEBUG: Removed container {container_id[:8]}... from tracking", file=sys.stderr)
+                invalidate_discover_cache()
                 
                 self.send_response(200)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({"stopped": container_id}).encode())
+                self.wfile.write(json_bytes({"stopped": container_id}))
                 return
             except Exception as e:
                 # Even if stopping failed, remove from tracking
                 with LOCK:
                     if container_id in PROXIES:
                         del PROXIES[container_id]
+                        mark_proxies_changed()
                         print(f"DEBUG: Removed failed container {container_id[:8]}... from tracking", file=sys.stderr)
+                invalidate_discover_cache()
                 
                 self.send_response(200)  # Return success even if container was already gone
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({"stopped": container_id, "note": "Container was already stopped or removed"}).encode())
+                self.wfile.write(json_bytes({"stopped": container_id, "note": "Container was already stopped or removed"}))
                 return
         if self.path == "/api/containers/start":
             try:
                 self.log_message("Starting container...")
-                resp = start_container_and_proxy()
+                resp = await start_container_and_proxy()
                 self.log_message(f"Container started: {resp['containerId']}")
                 self.send_response(200)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps(resp).encode())
+                self.wfile.write(json_bytes(resp))
             except subprocess.CalledProcessError as e:
                 self.log_message(f"Launcher failed: {e.stdout} {e.stderr}")
                 self.send_response(500)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({
+                self.wfile.write(json_bytes({
                     "error": "launcher_failed",
                     "stdout": e.stdout,
                     "stderr": e.stderr,
-                }).encode())
+                }))
             except Exception as e:
                 self.log_message(f"Unexpected error: {e}")
                 self.send_response(500)
                 self._set_cors()
                 self.send_header("Content-Type", "application/json")
                 self.end_headers()
-                self.wfile.write(json.dumps({"error": str(e)}).encode())
+                self.wfile.write(json_bytes({"error": str(e)}))
             return
 
         self.send_response(404)
@@ -469,42 +873,61 @@ class Handler(BaseHTTPRequestHandler):
 async def start_websocket_server():
     """Start the WebSocket proxy server"""
     global WEBSOCKET_SERVER
+    # Pre-configure the listening socket so accepted connections inherit the buffer sizes
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if API_REUSE_PORT:
+        # Lets several worker processes share the port; the kernel balances new connections
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    tune_proxy_socket(sock)
+    sock.bind(("127.0.0.1", 8124))  # WebSocket server on port 8124
     WEBSOCKET_SERVER = await websockets.serve(
-        websocket_proxy_handler, 
-        "127.0.0.1", 
-        8124  # WebSocket server on port 8124
+        websocket_proxy_handler,
+        sock=sock,
+        compression=None,  # RFB encodings are already compressed; deflate only burns CPU
+        max_queue=64  # Bound buffered inbound frames for backpressure
     )
     print(f"WebSocket proxy server listening on ws://127.0.0.1:8124", file=sys.stderr)
     await WEBSOCKET_SERVER.wait_closed()
 
 
-def main():
-    host = os.environ.get("API_HOST", "127.0.0.1")
-    port = int(os.environ.get("API_PORT", "8123"))
-    
+async def start_http_server(host, port):
+    """Start the HTTP API and static file server"""
+    # SO_REUSEPORT (opt-in) lets several worker processes share the port
+    server = await asyncio.start_server(
+        Handler.handle_connection, host, port, reuse_port=API_REUSE_PORT
+    )
+    print(f"API listening on http://{host}:{port}", file=sys.stderr)
+    await server.serve_forever()
+
+
+async def serve(host, port):
     # Discover existing containers on startup
     print("DEBUG: Discovering existing containers...", file=sys.stderr)
-    discovered = discover_existing_containers()
+    discovered = await discover_existing_containers()
     with LOCK:
         PROXIES.update(discovered)
+        mark_proxies_changed()
     print(f"DEBUG: Found {len(discovered)} existing containers", file=sys.stderr)
     
-    # Start WebSocket server in a separate thread
-    def run_websocket_server():
-        asyncio.run(start_websocket_server())
-    
-    websocket_thread = threading.Thread(target=run_websocket_server, daemon=True)
-    websocket_thread.start()
+    # HTTP and WebSocket servers share one event loop
+    await asyncio.gather(
+        start_http_server(host, port),
+        start_websocket_server(),
+    )
+
+
+def main():
+    host = os.environ.get("API_HOST", "127.0.0.1")
+    port = int(os.environ.get("API_PORT", "8123"))
     
-    httpd = ThreadingHTTPServer((host, port), Handler)
-    print(f"API listening on http://{host}:{port}", file=sys.stderr)
+    # uvloop, when installed, cuts per-frame event loop overhead on the proxy
+    run = uvloop.run if uvloop is not None else asyncio.run
     try:
-        httpd.serve_forever()
+        run(serve(host, port))
     except KeyboardInterrupt:
         pass
 
 
 if __name__ == "__main__":
     main()
-
-
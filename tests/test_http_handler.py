@@ -0,0 +1,90 @@
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+
+class AsyncHTTPHandlerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = await asyncio.start_server(server.Handler.handle_connection, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def request(self, raw: bytes) -> bytes:
+        """Send raw bytes, half-close, and return everything the server sends back"""
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(raw)
+        writer.write_eof()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response
+
+    async def get(self, path: str, *headers: str) -> tuple[int, dict, bytes]:
+        extra = "".join(f"{h}\r\n" for h in headers)
+        response = await self.request(f"GET {path} HTTP/1.1\r\nHost: x\r\n{extra}\r\n".encode())
+        head, _, body = response.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        fields = dict(line.split(": ", 1) for line in lines[1:])
+        return int(lines[0].split()[1]), fields, body
+
+    async def test_health(self):
+        status, headers, body = await self.get("/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/json")
+        self.assertIn(b"true", body)
+
+    async def test_health_with_query_string(self):
+        status, headers, _ = await self.get("/health?x=1")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/json")
+
+    async def test_static_file_with_query_string(self):
+        path = "/vendor/noVNC/vendor/pako/lib/utils/common.js"
+        status, headers, body = await self.get(path + "?v=2")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "application/javascript")
+        with open(server._WEB_DIR + path, "rb") as f:
+            self.assertEqual(body, f.read())
+
+    async def test_static_index_and_etag(self):
+        status, headers, body = await self.get("/")
+        self.assertEqual(status, 200)
+        self.assertEqual(headers["Content-Type"], "text/html")
+        with open(os.path.join(server._WEB_DIR, "index.html"), "rb") as f:
+            self.assertEqual(body, f.read())
+
+        status, headers, body = await self.get("/", f"If-None-Match: {headers['ETag']}")
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b"")
+
+    async def test_directory_traversal_is_forbidden(self):
+        status, _, _ = await self.get("/../server.py")
+        self.assertEqual(status, 403)
+
+    async def test_unknown_method(self):
+        response = await self.request(b"DELETE / HTTP/1.1\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.0 501 "))
+
+    async def test_empty_request_closes_silently(self):
+        self.assertEqual(await self.request(b""), b"")
+        self.assertEqual(await self.request(b"\r\n"), b"")
+
+    async def test_malformed_request_line(self):
+        response = await self.request(b"GET /\r\n\r\n")
+        self.assertTrue(response.startswith(b"HTTP/1.0 400 "))
+
+    async def test_bad_content_length(self):
+        for value in (b"abc", b"-5"):
+            response = await self.request(b"POST /api/x HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n")
+            self.assertTrue(response.startswith(b"HTTP/1.0 400 "), response)
+
+
+if __name__ == "__main__":
+    unittest.main()